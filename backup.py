@@ -0,0 +1,287 @@
+import os
+import re
+import json
+import time
+import zlib
+import base64
+import sqlite3
+import tempfile
+import threading
+from cryptography.fernet import Fernet, InvalidToken
+from storage import Storage
+from debug import log_info, log_error
+
+BACKUP_DIRNAME = "backups"
+# <seq>-<full|delta>-<unix time>.nexa, e.g. 000042-delta-1792414659.nexa
+BACKUP_PATTERN = re.compile(r"^(\d{6})-(full|delta)-(\d+)\.nexa$")
+
+# Pages copied per step of the online backup and the pause between steps,
+# so a running session is never locked out for more than one short step.
+PAGES_PER_STEP = 64
+STEP_SLEEP_SECONDS = 0.005
+
+# Take a fresh full snapshot after this many incremental deltas.
+MAX_DELTAS = 24
+# Seconds between automatic backups while Nexa is running.
+BACKUP_INTERVAL = 3600
+# Seconds to wait on exit for a backup that is still being written.
+SHUTDOWN_TIMEOUT = 10
+
+# Columns carried in deltas, in order. Blobs are base64-encoded in the payload.
+ENTRY_COLUMNS = ("service", "username", "password", "folder", "folder_idx", "created_at", "updated_at")
+
+
+class Backup:
+    # ----------------- Path helpers -----------------
+    @staticmethod
+    def get_backup_dir():
+        backup_dir = os.path.join(Storage.get_data_dir(), BACKUP_DIRNAME)
+        os.makedirs(backup_dir, exist_ok=True)
+        return backup_dir
+
+    @staticmethod
+    def list_backups():
+        """Return [(seq, kind, created_at, filename), ...] oldest first."""
+        backups = []
+        for name in os.listdir(Backup.get_backup_dir()):
+            match = BACKUP_PATTERN.match(name)
+            if match:
+                backups.append((int(match.group(1)), match.group(2), int(match.group(3)), name))
+        return sorted(backups)
+
+    # ----------------- Create -----------------
+    @staticmethod
+    def create(conn, fernet: Fernet, full=False):
+        """
+        Write the next backup and return its filename.
+        An incremental delta is written when the vault's journal continues
+        from the newest backup on disk; otherwise a full snapshot is taken.
+        Returns None when a delta would be empty.
+        """
+        backups = Backup.list_backups()
+        last = backups[-1] if backups else None
+        since_full = 0
+        for _, kind, _, _ in reversed(backups):
+            if kind == "full":
+                break
+            since_full += 1
+
+        continues_chain = last is not None and Backup._get_meta(conn, "last_backup") == last[3]
+        if full or not continues_chain or since_full >= MAX_DELTAS:
+            kind = "full"
+        else:
+            kind = "delta"
+            if conn.execute("SELECT 1 FROM change_journal LIMIT 1").fetchone() is None:
+                log_info("No changes since the last backup; skipped.")
+                return None
+
+        seq = last[0] + 1 if last else 1
+        name = f"{seq:06d}-{kind}-{int(time.time())}.nexa"
+        if kind == "full":
+            payload, journal_seq = Backup._full_payload(conn)
+        else:
+            payload, journal_seq = Backup._delta_payload(conn)
+
+        Backup._write_encrypted(os.path.join(Backup.get_backup_dir(), name), fernet, payload)
+
+        # Only forget journal entries once the backup holding them is on disk.
+        with conn:
+            conn.execute("DELETE FROM change_journal WHERE seq<=?", (journal_seq,))
+            conn.execute(
+                "INSERT OR REPLACE INTO backup_meta (key, value) VALUES ('last_backup', ?)",
+                (name,)
+            )
+        log_info(f"Wrote {kind} backup {name}.")
+        return name
+
+    @staticmethod
+    def _full_payload(conn):
+        """Snapshot the live database with the online backup API, in paced steps."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot_path = os.path.join(tmp_dir, "snapshot.db")
+            target = sqlite3.connect(snapshot_path)
+            try:
+                conn.backup(target, pages=PAGES_PER_STEP, sleep=STEP_SLEEP_SECONDS)
+                row = target.execute("SELECT MAX(seq) FROM change_journal").fetchone()
+            finally:
+                target.close()
+            with open(snapshot_path, "rb") as f:
+                data = f.read()
+        return b"F" + data, row[0] or 0
+
+    @staticmethod
+    def _delta_payload(conn):
+        """Collect the current state of every journaled row in one read transaction."""
+        in_transaction = conn.in_transaction
+        if not in_transaction:
+            conn.execute("BEGIN")
+        try:
+            journal_seq = conn.execute("SELECT MAX(seq) FROM change_journal").fetchone()[0] or 0
+            entry_ids = [
+                row[0] for row in conn.execute(
+                    "SELECT DISTINCT entry_id FROM change_journal WHERE seq<=? ORDER BY entry_id",
+                    (journal_seq,)
+                )
+            ]
+            upserts = []
+            deletes = []
+            for entry_id in entry_ids:
+                row = conn.execute(
+                    f"SELECT {', '.join(ENTRY_COLUMNS)} FROM passwords WHERE rowid=?",
+                    (entry_id,)
+                ).fetchone()
+                if row is None:
+                    deletes.append(entry_id)
+                    continue
+                tags = conn.execute(
+                    "SELECT tag, tag_idx FROM tags WHERE entry_id=? ORDER BY rowid", (entry_id,)
+                ).fetchall()
+                upserts.append({
+                    "rowid": entry_id,
+                    "row": [Backup._encode(value) for value in row],
+                    "tags": [[Backup._encode(tag), Backup._encode(tag_idx)] for tag, tag_idx in tags],
+                })
+        finally:
+            if not in_transaction:
+                conn.commit()
+        delta = {"upserts": upserts, "deletes": deletes}
+        return b"D" + json.dumps(delta, separators=(",", ":")).encode("utf-8"), journal_seq
+
+    # ----------------- Restore -----------------
+    @staticmethod
+    def restore(fernet: Fernet, output_path: str, at=None):
+        """
+        Rebuild the vault as it was at Unix time `at` (default: newest backup)
+        into output_path by loading the last full snapshot before `at` and
+        replaying the deltas that follow it. Returns the backups applied.
+        """
+        if os.path.exists(output_path):
+            raise FileExistsError(f"Refusing to overwrite existing file: {output_path}")
+
+        backups = [b for b in Backup.list_backups() if at is None or b[2] <= at]
+        fulls = [i for i, b in enumerate(backups) if b[1] == "full"]
+        if not fulls:
+            raise FileNotFoundError("No full backup found at or before the requested time.")
+        chain = backups[fulls[-1]:]
+
+        backup_dir = Backup.get_backup_dir()
+        tmp_path = output_path + ".tmp"
+        snapshot = Backup._read_encrypted(os.path.join(backup_dir, chain[0][3]), fernet)
+        if snapshot[:1] != b"F":
+            raise ValueError(f"{chain[0][3]} is not a full snapshot.")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(snapshot[1:])
+
+            conn = sqlite3.connect(tmp_path)
+            try:
+                with conn:
+                    for _, _, _, name in chain[1:]:
+                        delta = Backup._read_encrypted(os.path.join(backup_dir, name), fernet)
+                        if delta[:1] != b"D":
+                            raise ValueError(f"{name} is not an incremental delta.")
+                        Backup._apply_delta(conn, json.loads(delta[1:]))
+                    # The restored vault starts a new backup chain.
+                    conn.execute("DELETE FROM change_journal")
+                    conn.execute("DELETE FROM backup_meta")
+            except sqlite3.DatabaseError as e:
+                raise ValueError(f"Could not rebuild the vault: {e}") from None
+            finally:
+                conn.close()
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            # Never leave a half-restored vault behind.
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        log_info(f"Restored vault from {len(chain)} backup(s) to {output_path}.")
+        return [name for _, _, _, name in chain]
+
+    @staticmethod
+    def _apply_delta(conn, delta):
+        for entry_id in delta["deletes"]:
+            conn.execute("DELETE FROM passwords WHERE rowid=?", (entry_id,))
+            conn.execute("DELETE FROM tags WHERE entry_id=?", (entry_id,))
+        for upsert in delta["upserts"]:
+            entry_id = upsert["rowid"]
+            values = [Backup._decode(value) for value in upsert["row"]]
+            conn.execute(
+                f"INSERT OR REPLACE INTO passwords (rowid, {', '.join(ENTRY_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' for _ in ENTRY_COLUMNS)})",
+                [entry_id] + values
+            )
+            conn.execute("DELETE FROM tags WHERE entry_id=?", (entry_id,))
+            conn.executemany(
+                "INSERT INTO tags (entry_id, tag, tag_idx) VALUES (?, ?, ?)",
+                [(entry_id, Backup._decode(tag), Backup._decode(tag_idx)) for tag, tag_idx in upsert["tags"]]
+            )
+
+    # ----------------- Scheduling -----------------
+    @staticmethod
+    def start_scheduler(fernet: Fernet, interval: int = BACKUP_INTERVAL):
+        """
+        Back up the vault every `interval` seconds on a daemon thread with its
+        own connection, starting immediately if the newest backup is older
+        than that. Returns (stop, thread): set the Event to stop the loop, then
+        join the thread so a backup in progress can finish.
+        """
+        stop = threading.Event()
+
+        def run():
+            conn = sqlite3.connect(Storage.get_db_path())
+            try:
+                backups = Backup.list_backups()
+                wait = 0
+                if backups:
+                    wait = max(0, backups[-1][2] + interval - time.time())
+                while not stop.wait(wait):
+                    try:
+                        Backup.create(conn, fernet)
+                    except (OSError, sqlite3.Error) as e:
+                        log_error(f"Scheduled backup failed: {e}")
+                    wait = interval
+            finally:
+                conn.close()
+
+        thread = threading.Thread(target=run, name="nexa-backup", daemon=True)
+        thread.start()
+        return stop, thread
+
+    # ----------------- Internal helpers -----------------
+    @staticmethod
+    def _get_meta(conn, key):
+        row = conn.execute("SELECT value FROM backup_meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _write_encrypted(path, fernet: Fernet, payload: bytes):
+        """Compress, encrypt and atomically write a backup file."""
+        token = fernet.encrypt(zlib.compress(payload, 9))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(token)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_encrypted(path, fernet: Fernet) -> bytes:
+        """Read a backup file, raising ValueError if it is corrupt or under another key."""
+        with open(path, "rb") as f:
+            token = f.read()
+        try:
+            return zlib.decompress(fernet.decrypt(token))
+        except (InvalidToken, zlib.error):
+            raise ValueError(
+                f"{os.path.basename(path)} is corrupt or was not written with this master password."
+            ) from None
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return {"b": base64.b64encode(value).decode("ascii")}
+        return value
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, dict):
+            return base64.b64decode(value["b"])
+        return value
\ No newline at end of file
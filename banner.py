@@ -1,23 +1,51 @@
-﻿import os
-import time
-import pyfiglet
+﻿import time
 from termcolor import colored
 from debug import log_debug, log_error
+from terminal import FrameRenderer, clear_screen, redraw_screen
+
+# Pre-rendered pyfiglet.figlet_format("Nexa", font="the_edge"), so the login
+# screen can be drawn without importing pyfiglet and loading its fonts.
+NEXA_BANNER = (
+    "   ▄   ▄███▄      ▄  ██   \n"
+    "    █  █▀   ▀ ▀▄   █ █ █  \n"
+    "██   █ ██▄▄     █ ▀  █▄▄█ \n"
+    "█ █  █ █▄   ▄▀ ▄ █   █  █ \n"
+    "█  █ █ ▀███▀  █   ▀▄    █ \n"
+    "█   ██         ▀       █  \n"
+    "                      ▀   \n"
+)
+
+_FIGLET_CACHE = {("Nexa", "the_edge"): NEXA_BANNER}
+
+
+def _figlet(text: str, font: str) -> str:
+    """Render text with pyfiglet, caching the result since fonts are slow to load."""
+    key = (text, font)
+    if key not in _FIGLET_CACHE:
+        import pyfiglet
+        _FIGLET_CACHE[key] = pyfiglet.figlet_format(text, font=font)
+    return _FIGLET_CACHE[key]
+
+
+def _colored_lines(text: str, color: str) -> str:
+    """Color each line separately so any single line can be redrawn on its own."""
+    return "\n".join(colored(line, color) if line else line for line in text.split("\n"))
 
-def clear_screen():
-    """Clears the terminal screen in a cross-platform way."""
-    os.system('cls' if os.name == 'nt' else 'clear')
 
 class Banner:
+    @staticmethod
+    def text() -> str:
+        """Return the colored Nexa ASCII art banner."""
+        return colored(_figlet("Nexa", "the_edge"), 'magenta')
+
     @staticmethod
     def print():
         """
         Displays the Nexa ASCII art banner in magenta using the 'the_edge' font.
         """
-        clear_screen()
-        ascii_banner = pyfiglet.figlet_format("Nexa", font="the_edge")
-        print(colored(ascii_banner, 'magenta'))
-        log_debug("Displayed Nexa ASCII banner.")
+        # Not logged: this is drawn before the login prompt, and logging
+        # here would load the logging module on the start-up path.
+        redraw_screen(Banner.text() + "\n")
 
     @staticmethod
     def access_denied_animation(duration_seconds: int = 4):
@@ -25,26 +53,24 @@ class Banner:
         Animated ACCESS DENIED screen in red.
         duration_seconds: total approximate seconds the animation should run.
         """
-        clear_screen()
         denied_text = "ACCESS DENIED"
         font = "smbraille"
-        ascii_denied = pyfiglet.figlet_format(denied_text, font=font)
+        ascii_denied = _colored_lines(_figlet(denied_text, font), 'red')
         spinner = ['|', '/', '-', '\\']
         cycles = max(2, int(duration_seconds / 0.5))
         start = time.time()
+        renderer = FrameRenderer()
         for cycle in range(cycles):
-            print(colored(ascii_denied, 'red'))
             for i in range(8):
                 elapsed = int(time.time() - start)
-                msg = f"\r{spinner[i % 4]} Unauthorized access detected. Locking in {max(0, duration_seconds - elapsed)}s..."
-                print(colored(msg, 'red'), end='', flush=True)
+                msg = f"{spinner[i % 4]} Unauthorized access detected. Locking in {max(0, duration_seconds - elapsed)}s..."
+                renderer.draw(ascii_denied + "\n" + colored(msg, 'red'))
                 time.sleep(0.12)
-            print('\r' + ' ' * 80, end='\r')
-            clear_screen()
+            # Blank frame for the blink effect.
+            renderer.draw("")
             time.sleep(0.06)
-        clear_screen()
-        print(colored(ascii_denied, 'red'))
-        print(colored("Too many failed attempts. System locked.", 'red'))
+        renderer.close()
+        redraw_screen(ascii_denied + "\n" + colored("Too many failed attempts. System locked.", 'red') + "\n")
         log_error("Master password access denied animation shown; exiting.")
         time.sleep(2)
         clear_screen()
@@ -54,11 +80,10 @@ class Banner:
         """
         Displays an 'Access Granted' ASCII art animation in green, with a loading spinner.
         """
-        clear_screen()
         access_granted = "Access Granted"
         font = "smbraille"
-        ascii_access = pyfiglet.figlet_format(access_granted, font=font)
-        print(colored(ascii_access, 'green'))
+        ascii_access = _figlet(access_granted, font)
+        redraw_screen(colored(ascii_access, 'green') + "\n")
         log_debug("Access granted banner displayed.")
         spinner = ['|', '/', '-', '\\']
         print(colored("Please wait while we unlock your vault...", 'yellow'))
@@ -74,20 +99,21 @@ class Banner:
         """
         Displays an animated 'Exiting...' ASCII art with dots loading.
         """
-        clear_screen()
         base_text = "Exiting"
         font = "smbraille"
+        frames = [
+            _colored_lines(_figlet(base_text + " " + ("." * dots), font), 'red')
+            for dots in range(1, 4)
+        ]
 
+        renderer = FrameRenderer()
         # Animate 3 dots (repeat a few times if you want)
         for cycle in range(2):  # repeat the dot animation 2 times
-            for dots in range(1, 4):
-                closing = base_text + " " + ("." * dots)
-                ascii_closing = pyfiglet.figlet_format(closing, font=font)
-                clear_screen()
-                print(colored(ascii_closing, 'red'))
+            for dots, frame in enumerate(frames, 1):
+                renderer.draw(frame)
                 log_debug(f"Exit banner displayed with {dots} dots.")
                 time.sleep(0.5)
+        renderer.close()
 
         clear_screen()
-        time.sleep(1)
-        clear_screen()
\ No newline at end of file
+        time.sleep(1)
\ No newline at end of file
@@ -1,4 +1,3 @@
-import logging
 import os
 
 _LOGGER = None
@@ -9,6 +8,9 @@ def get_logger(log_file="debug.log"):
     if _LOGGER is not None:
         return _LOGGER
 
+    # Deferred so start-up does not pay for logging until the first message.
+    import logging
+
     logger = logging.getLogger("NexaDebug")
     logger.setLevel(logging.DEBUG)
 
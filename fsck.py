@@ -0,0 +1,341 @@
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from cryptography.fernet import Fernet, InvalidToken
+from termcolor import colored
+from storage import Storage
+from terminal import is_interactive
+from debug import log_info, log_error
+
+# Rows handed to a single worker. Large enough to amortise the per-task
+# overhead, small enough to keep the progress indicator moving.
+CHUNK_SIZE = 2000
+
+_worker_fernet = None
+
+
+def _init_worker(key: bytes):
+    """Build the Fernet instance once per worker process."""
+    global _worker_fernet
+    _worker_fernet = Fernet(key)
+
+
+def _check_chunk(db_path: str, first_rowid: int, last_rowid: int, has_folder=True, has_tags=True):
+    """
+    Decrypt every token of the rows in [first_rowid, last_rowid], including their tags.
+
+    Returns (results, error). results is a list of (rowid, service) tuples
+    where service is the lowercased service name, or None when any token of
+    the row is unreadable. error is the SQLite error message when the range
+    itself could not be read, in which case results is empty.
+    """
+    folder_column = "folder" if has_folder else "NULL"
+    try:
+        conn = Storage.connect_readonly(db_path)
+        try:
+            rows = conn.execute(
+                f"SELECT rowid, service, username, password, {folder_column} FROM passwords "
+                "WHERE rowid BETWEEN ? AND ?",
+                (first_rowid, last_rowid)
+            ).fetchall()
+            tag_rows = []
+            if has_tags:
+                tag_rows = conn.execute(
+                    "SELECT entry_id, tag FROM tags WHERE entry_id BETWEEN ? AND ?",
+                    (first_rowid, last_rowid)
+                ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:
+        return [], str(e)
+
+    bad_tags = set()
+    for entry_id, enc_tag in tag_rows:
+        try:
+            _worker_fernet.decrypt(enc_tag).decode("utf-8")
+        except (InvalidToken, UnicodeDecodeError, TypeError):
+            bad_tags.add(entry_id)
+
+    results = []
+    for rowid, enc_service, enc_username, enc_password, enc_folder in rows:
+        if rowid in bad_tags:
+            results.append((rowid, None))
+            continue
+        try:
+            service = _worker_fernet.decrypt(enc_service).decode("utf-8")
+            _worker_fernet.decrypt(enc_username).decode("utf-8")
+            _worker_fernet.decrypt(enc_password).decode("utf-8")
+            if enc_folder is not None:
+                _worker_fernet.decrypt(enc_folder).decode("utf-8")
+            results.append((rowid, service.lower()))
+        except (InvalidToken, UnicodeDecodeError, TypeError):
+            results.append((rowid, None))
+    return results, None
+
+
+class Fsck:
+    QUARANTINE_TABLE = "quarantine"
+    QUARANTINE_TAGS_TABLE = "quarantine_tags"
+
+    # Entry columns copied to and from the quarantine table.
+    ENTRY_COLUMNS = ("service", "username", "password", "folder", "folder_idx", "created_at", "updated_at")
+
+    # Columns added to the quarantine table after its first version.
+    QUARANTINE_EXTRA_COLUMNS = (
+        ("folder", "BLOB"),
+        ("folder_idx", "BLOB"),
+        ("created_at", "INTEGER"),
+        ("updated_at", "INTEGER"),
+    )
+
+    # ----------------- Checks -----------------
+    @staticmethod
+    def integrity_check(conn):
+        """Run SQLite's PRAGMA integrity_check and return any reported problems."""
+        try:
+            rows = conn.execute("PRAGMA integrity_check").fetchall()
+        except sqlite3.DatabaseError as e:
+            return [str(e)]
+        return [row[0] for row in rows if row[0] != "ok"]
+
+    @staticmethod
+    def verify_rows(conn, key: bytes, workers=None):
+        """
+        Verify every token of every row of the database behind conn in parallel chunks.
+        Returns (unreadable_rowids, duplicates, damaged) where duplicates maps a
+        lowercased service name to the sorted row ids sharing it, and damaged
+        lists (first_rowid, last_rowid, error) for ranges SQLite could not read.
+        The rowids are None when the table could not be listed at all.
+        """
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(passwords)")}
+            has_tags = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='tags'"
+            ).fetchone() is not None
+            rowids = [row[0] for row in conn.execute("SELECT rowid FROM passwords ORDER BY rowid")]
+        except sqlite3.DatabaseError as e:
+            return [], {}, [(None, None, str(e))]
+
+        total = len(rowids)
+        chunks = [
+            (rowids[i], rowids[min(i + CHUNK_SIZE, total) - 1], min(CHUNK_SIZE, total - i))
+            for i in range(0, total, CHUNK_SIZE)
+        ]
+        db_path = Fsck._db_path(conn)
+        has_folder = "folder" in columns
+        workers = workers or os.cpu_count() or 1
+
+        results = []
+        damaged = []
+        done = 0
+        Fsck._print_progress(done, total)
+        if workers == 1 or len(chunks) <= 1:
+            # Not worth spawning processes for a single chunk.
+            _init_worker(key)
+            outcomes = (
+                ((first, last, count), _check_chunk(db_path, first, last, has_folder, has_tags))
+                for first, last, count in chunks
+            )
+            for chunk, (chunk_results, error) in outcomes:
+                done += chunk[2]
+                Fsck._collect(chunk, chunk_results, error, results, damaged)
+                Fsck._print_progress(done, total)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(key,)) as pool:
+                futures = {
+                    pool.submit(_check_chunk, db_path, first, last, has_folder, has_tags): (first, last, count)
+                    for first, last, count in chunks
+                }
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    chunk_results, error = future.result()
+                    done += chunk[2]
+                    Fsck._collect(chunk, chunk_results, error, results, damaged)
+                    Fsck._print_progress(done, total)
+        if is_interactive():
+            print()
+
+        unreadable = []
+        by_service = {}
+        for rowid, service in results:
+            if service is None:
+                unreadable.append(rowid)
+            else:
+                by_service.setdefault(service, []).append(rowid)
+        duplicates = {
+            service: sorted(ids) for service, ids in by_service.items() if len(ids) > 1
+        }
+        return sorted(unreadable), duplicates, sorted(damaged)
+
+    @staticmethod
+    def _collect(chunk, chunk_results, error, results, damaged):
+        if error is not None:
+            damaged.append((chunk[0], chunk[1], error))
+        else:
+            results.extend(chunk_results)
+
+    @staticmethod
+    def _db_path(conn):
+        """Return the file behind conn's main database, so workers check the same file."""
+        for _, name, path in conn.execute("PRAGMA database_list"):
+            if name == "main":
+                return path
+        return Storage.get_db_path()
+
+    # ----------------- Repair -----------------
+    @staticmethod
+    def quarantine(conn, rowids, reason: str):
+        """Move the given rows into the quarantine table and remove them from the vault."""
+        if not rowids:
+            return 0
+        Fsck._init_quarantine(conn)
+        with conn:
+            for rowid in rowids:
+                cursor = conn.execute(
+                    f"INSERT INTO {Fsck.QUARANTINE_TABLE} "
+                    f"(original_rowid, reason, {', '.join(Fsck.ENTRY_COLUMNS)}) "
+                    f"SELECT rowid, ?, {', '.join(Fsck.ENTRY_COLUMNS)} FROM passwords WHERE rowid=?",
+                    (reason, rowid)
+                )
+                conn.execute(
+                    f"INSERT INTO {Fsck.QUARANTINE_TAGS_TABLE} (quarantine_id, original_rowid, tag, tag_idx) "
+                    "SELECT ?, entry_id, tag, tag_idx FROM tags WHERE entry_id=? ORDER BY rowid",
+                    (cursor.lastrowid, rowid)
+                )
+            conn.executemany("DELETE FROM passwords WHERE rowid=?", [(rowid,) for rowid in rowids])
+            conn.executemany("DELETE FROM tags WHERE entry_id=?", [(rowid,) for rowid in rowids])
+            Storage.journal(conn, rowids)
+        log_info(f"Quarantined {len(rowids)} row(s): {reason}.")
+        return len(rowids)
+
+    @staticmethod
+    def release(conn, original_rowids):
+        """
+        Move quarantined entries (by their original row id) back into the vault,
+        tags included. The original row id is reused when it is still free.
+        Returns {original_rowid: new_rowid} for the entries released.
+        """
+        Fsck._init_quarantine(conn)
+        released = {}
+        with conn:
+            for original in original_rowids:
+                row = conn.execute(
+                    f"SELECT rowid, {', '.join(Fsck.ENTRY_COLUMNS)} FROM {Fsck.QUARANTINE_TABLE} "
+                    "WHERE original_rowid=? ORDER BY rowid DESC LIMIT 1",
+                    (original,)
+                ).fetchone()
+                if row is None:
+                    continue
+                quarantine_id, values = row[0], list(row[1:])
+                taken = conn.execute("SELECT 1 FROM passwords WHERE rowid=?", (original,)).fetchone()
+                cursor = conn.execute(
+                    f"INSERT INTO passwords (rowid, {', '.join(Fsck.ENTRY_COLUMNS)}) "
+                    f"VALUES (?, {', '.join('?' for _ in Fsck.ENTRY_COLUMNS)})",
+                    [None if taken else original] + values
+                )
+                new_rowid = cursor.lastrowid
+                # Tags quarantined before quarantine_id existed are matched by original row id.
+                tag_filter = "quarantine_id=? OR (quarantine_id IS NULL AND original_rowid=?)"
+                conn.execute(
+                    "INSERT INTO tags (entry_id, tag, tag_idx) "
+                    f"SELECT ?, tag, tag_idx FROM {Fsck.QUARANTINE_TAGS_TABLE} WHERE {tag_filter} ORDER BY rowid",
+                    (new_rowid, quarantine_id, original)
+                )
+                conn.execute(f"DELETE FROM {Fsck.QUARANTINE_TAGS_TABLE} WHERE {tag_filter}", (quarantine_id, original))
+                conn.execute(f"DELETE FROM {Fsck.QUARANTINE_TABLE} WHERE rowid=?", (quarantine_id,))
+                Storage.journal(conn, [new_rowid])
+                released[original] = new_rowid
+        log_info(f"Released {len(released)} row(s) from quarantine.")
+        return released
+
+    @staticmethod
+    def _init_quarantine(conn):
+        """Create the quarantine tables, adding columns missing from older vaults."""
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {Fsck.QUARANTINE_TABLE} (
+                original_rowid INTEGER NOT NULL,
+                reason TEXT NOT NULL,
+                service BLOB,
+                username BLOB,
+                password BLOB
+            )
+        """)
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({Fsck.QUARANTINE_TABLE})")}
+        for name, decl in Fsck.QUARANTINE_EXTRA_COLUMNS:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {Fsck.QUARANTINE_TABLE} ADD COLUMN {name} {decl}")
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {Fsck.QUARANTINE_TAGS_TABLE} (
+                original_rowid INTEGER NOT NULL,
+                tag BLOB,
+                tag_idx BLOB,
+                quarantine_id INTEGER
+            )
+        """)
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({Fsck.QUARANTINE_TAGS_TABLE})")}
+        if "quarantine_id" not in existing:
+            conn.execute(f"ALTER TABLE {Fsck.QUARANTINE_TAGS_TABLE} ADD COLUMN quarantine_id INTEGER")
+        conn.commit()
+
+    # ----------------- Entry point -----------------
+    @staticmethod
+    def run(conn, key: bytes, quarantine=False, workers=None) -> int:
+        """
+        Check the vault and print a report.
+        Returns 0 when the vault is clean, 1 otherwise.
+        """
+        print(colored("=== Nexa Vault Check ===", "cyan"))
+        problems = Fsck.integrity_check(conn)
+        if problems:
+            print(colored("ERROR:", "red"), "SQLite integrity check failed:")
+            for problem in problems:
+                print(f"  {problem}")
+            log_error(f"SQLite integrity check failed with {len(problems)} problem(s).")
+        else:
+            print(colored("SQLite integrity check: ok", "green"))
+
+        unreadable, duplicates, damaged = Fsck.verify_rows(conn, key, workers)
+
+        for first, last, error in damaged:
+            where = "passwords table" if first is None else f"rows {first}-{last}"
+            print(colored("ERROR:", "red"), f"Could not read {where}: {error}")
+            log_error(f"Could not read {where}: {error}")
+
+        if unreadable:
+            print(colored("Unreadable rows:", "red"), ", ".join(str(rowid) for rowid in unreadable))
+            log_error(f"Found {len(unreadable)} unreadable row(s).")
+        else:
+            print(colored("Unreadable rows: none", "green"))
+
+        if duplicates:
+            print(colored("Duplicate services:", "yellow"))
+            for service, ids in sorted(duplicates.items()):
+                print(f"  {colored(service, 'cyan')}: rows {', '.join(str(rowid) for rowid in ids)}")
+            log_error(f"Found {len(duplicates)} duplicated service(s).")
+        else:
+            print(colored("Duplicate services: none", "green"))
+
+        if quarantine:
+            try:
+                moved = Fsck.quarantine(conn, unreadable, "unreadable")
+                # Keep the oldest row of each duplicate set, as lookups already do.
+                extra = [rowid for ids in duplicates.values() for rowid in ids[1:]]
+                moved += Fsck.quarantine(conn, extra, "duplicate")
+            except sqlite3.DatabaseError as e:
+                print(colored("ERROR:", "red"), f"Quarantine failed: {e}")
+                log_error(f"Quarantine failed: {e}")
+                moved = 0
+            if moved:
+                print(colored(f"Moved {moved} row(s) to the '{Fsck.QUARANTINE_TABLE}' table.", "yellow"))
+
+        clean = not problems and not unreadable and not duplicates and not damaged
+        log_info(f"Vault check finished ({'clean' if clean else 'problems found'}).")
+        return 0 if clean else 1
+
+    @staticmethod
+    def _print_progress(done: int, total: int):
+        # Redrawn with \r, so only drawn on a terminal; piped output gets the report alone.
+        if not is_interactive():
+            return
+        percent = 100 if total == 0 else int(done * 100 / total)
+        print(f"\rVerifying rows... {done}/{total} ({percent}%)", end='', flush=True)
\ No newline at end of file
@@ -1,11 +1,12 @@
-﻿import sys
+﻿import os
+import sys
 import time
-from storage import Storage
-from banner import Banner, clear_screen
+from banner import Banner
 from termcolor import colored
 from master_password import MasterPasswordManager
-from security import derive_fernet
-from UI import UI
+
+# Only what is needed to reach the first prompt is imported above. Storage,
+# the UI and the cryptography backend are imported once the vault is unlocked.
 
 def typewriter(text, color=None, delay=0.03):
     for char in text:
@@ -18,7 +19,6 @@ def typewriter(text, color=None, delay=0.03):
     print()
 
 def show_welcome():
-    clear_screen()
     Banner.print()
     print(colored("Welcome to Nexa!", "cyan"))
     print()
@@ -38,7 +38,147 @@ def show_welcome():
     print('\r' + colored(message + " ✔", "green"))
     input("\nPress Enter to continue...")
 
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="nexa", description="Nexa password manager.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    fsck_parser = subparsers.add_parser("fsck", help="Check the vault for corrupt or duplicate entries.")
+    fsck_parser.add_argument("--quarantine", action="store_true",
+                             help="Move unreadable and duplicate rows to a side table.")
+    fsck_parser.add_argument("--workers", type=int, default=None,
+                             help="Number of worker processes (default: all cores).")
+    fsck_parser.add_argument("--release", type=int, nargs="+", metavar="ROWID",
+                             help="Move quarantined entries (by original row id) back into the vault.")
+
+    list_parser = subparsers.add_parser("list", help="List entries by folder, tag or age (passwords are not shown).")
+    list_parser.add_argument("--folder", help="Only entries in this folder.")
+    list_parser.add_argument("--tag", help="Only entries carrying this tag.")
+    list_parser.add_argument("--stale-days", type=int, default=None,
+                             help="Only entries whose password has not changed in this many days.")
+
+    backup_parser = subparsers.add_parser("backup", help="Write an encrypted full or incremental vault backup.")
+    backup_parser.add_argument("--full", action="store_true", help="Force a full snapshot.")
+
+    restore_parser = subparsers.add_parser("restore", help="Rebuild the vault as of a point in time.")
+    restore_parser.add_argument("--at", help='Restore point, e.g. "2026-10-19 14:00" (default: newest backup).')
+    restore_parser.add_argument("--output", help="Where to write the restored vault "
+                                                 "(default: vault.restored.db in the data directory).")
+    restore_parser.add_argument("--list", action="store_true", help="List available backups and exit.")
+    return parser.parse_args(argv)
+
+def run_fsck(args):
+    from fsck import Fsck
+    from security import derive_key
+    from storage import Storage
+
+    import sqlite3
+
+    master_pwd = MasterPasswordManager.verify_master_password()
+    key = derive_key(master_pwd)
+    # Only a repair may write to (and migrate) a vault that has not been checked yet.
+    writable = args.quarantine or args.release
+    try:
+        conn = Storage.init_db() if writable else Storage.connect_readonly()
+    except sqlite3.DatabaseError as e:
+        print(colored("ERROR:", "red"), f"Could not open the vault: {e}")
+        return 1
+    try:
+        if args.release:
+            released = Fsck.release(conn, args.release)
+            for original, new_rowid in released.items():
+                print(colored("Released:", "green"), f"row {original} is back as row {new_rowid}.")
+            missing = [rowid for rowid in args.release if rowid not in released]
+            if missing:
+                print(colored("ERROR:", "red"), f"Not in quarantine: {', '.join(str(rowid) for rowid in missing)}")
+            return 1 if missing else 0
+        return Fsck.run(conn, key, quarantine=args.quarantine, workers=args.workers)
+    finally:
+        conn.close()
+
+def run_list(args):
+    from security import derive_fernet
+    from storage import Storage
+
+    master_pwd = MasterPasswordManager.verify_master_password()
+    fernet = derive_fernet(master_pwd)
+    conn = Storage.init_db()
+    try:
+        entries = Storage.find_entries(conn, fernet, args.folder, args.tag, args.stale_days)
+    finally:
+        conn.close()
+    for entry in entries:
+        updated = time.strftime("%Y-%m-%d", time.localtime(entry["updated_at"])) if entry["updated_at"] else "unknown"
+        print("\t".join([
+            entry["service"],
+            entry["username"],
+            entry["folder"] or "",
+            ",".join(entry["tags"]),
+            updated,
+        ]))
+    return 0
+
+def run_backup(args):
+    from backup import Backup
+    from security import derive_fernet
+    from storage import Storage
+
+    master_pwd = MasterPasswordManager.verify_master_password()
+    fernet = derive_fernet(master_pwd)
+    conn = Storage.init_db()
+    try:
+        name = Backup.create(conn, fernet, full=args.full)
+    finally:
+        conn.close()
+    if name:
+        print(colored("Backup written:", "green"), os.path.join(Backup.get_backup_dir(), name))
+    else:
+        print(colored("No changes since the last backup.", "yellow"))
+    return 0
+
+def run_restore(args):
+    from datetime import datetime
+    from backup import Backup
+    from security import derive_fernet
+    from storage import Storage
+
+    if args.list:
+        for seq, kind, created_at, name in Backup.list_backups():
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created_at))}  {kind:<5}  {name}")
+        return 0
+
+    try:
+        at = int(datetime.fromisoformat(args.at).timestamp()) if args.at else None
+    except ValueError:
+        print(colored("ERROR:", "red"), f"Invalid restore point: {args.at}")
+        return 1
+    output = args.output or os.path.join(Storage.get_data_dir(), "vault.restored.db")
+
+    master_pwd = MasterPasswordManager.verify_master_password()
+    fernet = derive_fernet(master_pwd)
+    try:
+        applied = Backup.restore(fernet, output, at)
+    except (FileExistsError, FileNotFoundError, ValueError) as e:
+        print(colored("ERROR:", "red"), e)
+        return 1
+    print(colored(f"Restored from {len(applied)} backup(s) to:", "green"), output)
+    print("Close Nexa and replace vault.db with this file to use it.")
+    return 0
+
 def main():
+    # Skip argparse entirely for the common no-argument start.
+    if len(sys.argv) > 1:
+        args = parse_args()
+        if args.command == "fsck":
+            sys.exit(run_fsck(args))
+        if args.command == "list":
+            sys.exit(run_list(args))
+        if args.command == "backup":
+            sys.exit(run_backup(args))
+        if args.command == "restore":
+            sys.exit(run_restore(args))
+
     # Show welcome only if master password is not set
     if not MasterPasswordManager.is_set():
         show_welcome()
@@ -46,15 +186,28 @@ def main():
 
     # Verify and get master password
     master_pwd = MasterPasswordManager.verify_master_password()
+    from security import derive_fernet
     fernet = derive_fernet(master_pwd)
 
     # Init DB
+    from storage import Storage
     conn = Storage.init_db()
 
+    # Back up hourly in the background while the session is open
+    from backup import Backup, SHUTDOWN_TIMEOUT
+    stop_backups, backup_thread = Backup.start_scheduler(fernet)
+
     # Run UI
+    from UI import UI
     UI.main_menu(conn, fernet)
+    stop_backups.set()
+    backup_thread.join(SHUTDOWN_TIMEOUT)
 
 if __name__ == "__main__":
+    # Required for the fsck worker processes in frozen (PyInstaller) builds.
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()
     try:
         main()
     except KeyboardInterrupt:
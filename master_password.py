@@ -4,11 +4,9 @@ import base64
 import getpass
 import hashlib
 from termcolor import colored
-from banner import Banner, clear_screen
+from banner import Banner
 from debug import log_info, log_error
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.backends import default_backend
+from paths import get_data_dir
 
 
 
@@ -19,20 +17,17 @@ class MasterPasswordManager:
     @staticmethod
     def get_hash_path():
         """Return the path to the master password hash file."""
-        if os.name == "nt":
-            base_dir = os.getenv("LOCALAPPDATA") or os.getenv("APPDATA")
-        elif os.sys.platform == "darwin":
-            base_dir = os.path.expanduser("~/Library/Application Support")
-        else:
-            base_dir = os.path.expanduser("~/.local/share")
-        data_dir = os.path.join(base_dir, "Nexa")
-        os.makedirs(data_dir, exist_ok=True)
-        return os.path.join(data_dir, MasterPasswordManager.HASH_FILENAME)
+        return os.path.join(get_data_dir(), MasterPasswordManager.HASH_FILENAME)
 
     # ----------------- Internal helpers -----------------
     @staticmethod
     def _derive_hash(password: str, salt: bytes, iterations: int = 200_000) -> str:
         """Derive a base64-encoded password hash using PBKDF2HMAC."""
+        # Imported here so the cryptography backend loads after the login prompt, not before.
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.backends import default_backend
+
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
@@ -52,7 +47,6 @@ class MasterPasswordManager:
     @staticmethod
     def set_master_password():
         """Prompt user to set a new master password and store its salted hash, with a welcoming intro."""
-        clear_screen()
         Banner.print()
         print(colored("Welcome to Nexa!", "cyan"))
         print()
@@ -97,7 +91,6 @@ class MasterPasswordManager:
     @staticmethod
     def verify_master_password() -> str:
         """Prompt user to verify the master password, up to 3 attempts, with a polished login page."""
-        clear_screen()
         Banner.print()
         print(colored("v.1.0.0", "yellow"))
         print(colored("Login", "cyan"))
@@ -1,5 +1,6 @@
+import time
 import secrets
-from banner import clear_screen
+from terminal import clear_screen
 from termcolor import colored
 from storage import Storage
 from debug import log_info
@@ -38,11 +39,18 @@ class PasswordManager:
                 input("Press Enter to return to menu...")
                 return
 
-        Storage.add_password(conn, fernet, service, username, password)
+        folder = input("Folder (optional): ").strip()
+        tags = PasswordManager._parse_tags(input("Tags, comma-separated (optional): "))
+
+        Storage.add_password(conn, fernet, service, username, password, folder or None, tags)
         print("\nNew credentials created:")
         print(colored("Service:", "cyan"), service)
         print(f"Username: {username}")
         print(f"Password: {password}")
+        if folder:
+            print(f"Folder: {folder}")
+        if tags:
+            print(f"Tags: {', '.join(tags)}")
         log_info(f"Added password for service: {service}")
         input("\nPress Enter to return to menu...")
 
@@ -76,6 +84,7 @@ class PasswordManager:
             print(f"\nCredentials for {colored(service, 'cyan')}:")
             print(f"Username: {entry['username']}")
             print(f"Password: {entry['password']}")
+            PasswordManager._print_metadata(entry)
         else:
             print("\nService not found or no credentials stored.")
 
@@ -112,6 +121,7 @@ class PasswordManager:
             print(f"\nCurrent credentials for {colored(service, 'cyan')}:")
             print(f"Username: {entry['username']}")
             print(f"Password: {entry['password']}")
+            PasswordManager._print_metadata(entry)
         else:
             print("Service not found or no credentials stored.")
             input("\nPress Enter to return to menu...")
@@ -120,12 +130,27 @@ class PasswordManager:
         new_service = input("\nNew service name (leave blank to keep the same): ").strip()
         username = input("New username (blank to skip): ")
         password = input("New password (blank to skip): ")
+        folder = input("New folder (blank to skip, '-' to clear): ").strip()
+        tags_input = input("New tags, comma-separated (blank to skip, '-' to clear): ").strip()
+
+        if folder == '-':
+            folder = ''
+        elif not folder:
+            folder = None
+        if tags_input == '-':
+            tags = []
+        elif tags_input:
+            tags = PasswordManager._parse_tags(tags_input)
+        else:
+            tags = None
 
         success = Storage.update_password(
             conn, fernet, service,
             username if username else None,
             password if password else None,
-            new_service if new_service else None
+            new_service if new_service else None,
+            folder,
+            tags
         )
         if success:
             print(f"\nPassword for '{colored(service, 'cyan')}' was updated.")
@@ -203,4 +228,52 @@ class PasswordManager:
         else:
             print("\nNo changes made.")
 
-        input("Press Enter to return to menu...")
\ No newline at end of file
+        input("Press Enter to return to menu...")
+
+    @staticmethod
+    def filter_passwords(conn, fernet):
+        clear_screen()
+        print("=== Filter Passwords ===")
+        folder = input("Folder (blank for any): ").strip()
+        tag = input("Tag (blank for any): ").strip()
+        days_input = input("Only entries whose password is older than N days (blank for any): ").strip()
+        try:
+            stale_days = int(days_input) if days_input else None
+        except ValueError:
+            print(colored("\nERROR:", "red"), "Days must be a whole number.")
+            input("Press Enter to return to menu...")
+            return
+
+        entries = Storage.find_entries(conn, fernet, folder or None, tag or None, stale_days)
+        if not entries:
+            print("\nNo matching entries found.")
+            input("Press Enter to return to menu...")
+            return
+
+        print(f"\n{len(entries)} matching entr{'y' if len(entries) == 1 else 'ies'}:")
+        for entry in entries:
+            print(f"\n{colored(entry['service'], 'cyan')}")
+            print(f"Username: {entry['username']}")
+            PasswordManager._print_metadata(entry)
+        log_info(f"Filtered entries (folder={bool(folder)}, tag={bool(tag)}, stale_days={stale_days}).")
+        input("\nPress Enter to return to menu...")
+
+    # ----------------- Helpers -----------------
+    @staticmethod
+    def _parse_tags(text):
+        """Split a comma-separated tag list, dropping blanks."""
+        return [tag.strip() for tag in text.split(",") if tag.strip()]
+
+    @staticmethod
+    def _format_timestamp(timestamp):
+        if not timestamp:
+            return "unknown"
+        return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+    @staticmethod
+    def _print_metadata(entry):
+        if entry.get("folder"):
+            print(f"Folder: {entry['folder']}")
+        if entry.get("tags"):
+            print(f"Tags: {', '.join(entry['tags'])}")
+        print(f"Password changed: {PasswordManager._format_timestamp(entry.get('updated_at'))}")
\ No newline at end of file
@@ -0,0 +1,16 @@
+import os
+
+APP_DIR_NAME = "Nexa"
+
+
+def get_data_dir():
+    """Return platform-specific data dir and ensure it exists."""
+    if os.name == "nt":
+        base_dir = os.getenv("LOCALAPPDATA") or os.getenv("APPDATA")
+    elif os.sys.platform == "darwin":
+        base_dir = os.path.expanduser("~/Library/Application Support")
+    else:
+        base_dir = os.path.expanduser("~/.local/share")
+    data_dir = os.path.join(base_dir, APP_DIR_NAME)
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
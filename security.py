@@ -1,4 +1,6 @@
 import base64
+import hmac
+import hashlib
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.backends import default_backend
@@ -8,10 +10,35 @@ from cryptography.fernet import Fernet
 # Default salt (replace with securely stored random salt in production)
 DEFAULT_SALT = b"nexa_salt"
 
+# Label used to derive the blind-index key from the vault key, so the
+# index key is never the encryption key itself.
+BLIND_INDEX_LABEL = b"nexa-blind-index"
 
-def derive_fernet(password: str, salt: bytes = DEFAULT_SALT, iterations: int = 200_000) -> Fernet:
+
+class VaultFernet(Fernet):
     """
-    Derive a Fernet instance from a master password using PBKDF2-HMAC-SHA256.
+    Fernet that can also compute keyed blind indexes.
+
+    A blind index is an HMAC of a normalised plaintext value. It lets SQLite
+    match encrypted fields (folders, tags) through an index without storing
+    or decrypting the plaintext.
+    """
+
+    def __init__(self, key: bytes):
+        super().__init__(key)
+        self._index_key = hmac.new(
+            base64.urlsafe_b64decode(key), BLIND_INDEX_LABEL, hashlib.sha256
+        ).digest()
+
+    def blind_index(self, value: str) -> bytes:
+        """Return the keyed blind index for a case-insensitive value."""
+        normalized = value.strip().lower().encode("utf-8")
+        return hmac.new(self._index_key, normalized, hashlib.sha256).digest()
+
+
+def derive_key(password: str, salt: bytes = DEFAULT_SALT, iterations: int = 200_000) -> bytes:
+    """
+    Derive the url-safe base64 Fernet key for a master password using PBKDF2-HMAC-SHA256.
 
     Args:
         password (str): The master password provided by the user.
@@ -20,7 +47,7 @@ def derive_fernet(password: str, salt: bytes = DEFAULT_SALT, iterations: int = 2
         iterations (int): Number of PBKDF2 iterations. Default is 200,000.
 
     Returns:
-        Fernet: A Fernet instance for encryption and decryption.
+        bytes: A key suitable for constructing a Fernet instance.
     """
     if not isinstance(password, str) or not password:
         raise ValueError("Password must be a non-empty string.")
@@ -34,5 +61,20 @@ def derive_fernet(password: str, salt: bytes = DEFAULT_SALT, iterations: int = 2
         iterations=iterations,
         backend=default_backend(),
     )
-    key = base64.urlsafe_b64encode(kdf.derive(password.encode("utf-8")))
-    return Fernet(key)
\ No newline at end of file
+    return base64.urlsafe_b64encode(kdf.derive(password.encode("utf-8")))
+
+
+def derive_fernet(password: str, salt: bytes = DEFAULT_SALT, iterations: int = 200_000) -> VaultFernet:
+    """
+    Derive a Fernet instance from a master password using PBKDF2-HMAC-SHA256.
+
+    Args:
+        password (str): The master password provided by the user.
+        salt (bytes): The salt for key derivation. Should be securely random
+                      and stored alongside the hash in production.
+        iterations (int): Number of PBKDF2 iterations. Default is 200,000.
+
+    Returns:
+        VaultFernet: A Fernet instance for encryption, decryption and blind indexing.
+    """
+    return VaultFernet(derive_key(password, salt, iterations))
\ No newline at end of file
@@ -1,35 +1,46 @@
 import os
+import time
 import sqlite3
-from banner import clear_screen
+import pathlib
 from cryptography.fernet import Fernet, InvalidToken
 from debug import log_info, log_error
+from paths import get_data_dir
 
 
 class Storage:
     DB_FILENAME = "vault.db"
 
+    # Columns added after the original (service, username, password) schema.
+    # folder is encrypted; folder_idx is its keyed blind index.
+    # Timestamps are plain Unix seconds so they can be range-scanned;
+    # updated_at records the last password change, for rotation checks.
+    EXTRA_COLUMNS = (
+        ("folder", "BLOB"),
+        ("folder_idx", "BLOB"),
+        ("created_at", "INTEGER"),
+        ("updated_at", "INTEGER"),
+    )
+
     # ----------------- Path helpers -----------------
     @staticmethod
     def get_data_dir():
         """Return platform-specific data dir and ensure it exists."""
-        if os.name == "nt":
-            base_dir = os.getenv("LOCALAPPDATA") or os.getenv("APPDATA")
-        elif os.sys.platform == "darwin":
-            base_dir = os.path.expanduser("~/Library/Application Support")
-        else:
-            base_dir = os.path.expanduser("~/.local/share")
-        data_dir = os.path.join(base_dir, "Nexa")
-        os.makedirs(data_dir, exist_ok=True)
-        return data_dir
+        return get_data_dir()
 
     @staticmethod
     def get_db_path():
         return os.path.join(Storage.get_data_dir(), Storage.DB_FILENAME)
 
+    @staticmethod
+    def connect_readonly(db_path=None):
+        """Open the vault (or db_path) read-only, without creating or migrating anything."""
+        uri = pathlib.Path(db_path or Storage.get_db_path()).as_uri() + "?mode=ro"
+        return sqlite3.connect(uri, uri=True)
+
     # ----------------- DB init -----------------
     @staticmethod
     def init_db():
-        """Initialize database if not exists, return connection."""
+        """Initialize database if not exists, migrate older vaults, return connection."""
         conn = sqlite3.connect(Storage.get_db_path())
         cursor = conn.cursor()
         cursor.execute("""
@@ -39,20 +50,60 @@ class Storage:
                 password BLOB NOT NULL
             )
         """)
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(passwords)")}
+        for name, decl in Storage.EXTRA_COLUMNS:
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE passwords ADD COLUMN {name} {decl}")
+        # Entries from before timestamps were tracked get 0 (the epoch) so they
+        # count as stale and the stale filter stays a plain index range search.
+        cursor.execute("UPDATE passwords SET created_at=0 WHERE created_at IS NULL")
+        cursor.execute("UPDATE passwords SET updated_at=0 WHERE updated_at IS NULL")
+        # Tags reference passwords.rowid; each tag is encrypted with its blind index alongside.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tags (
+                entry_id INTEGER NOT NULL,
+                tag BLOB NOT NULL,
+                tag_idx BLOB NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_passwords_folder ON passwords(folder_idx)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_passwords_updated ON passwords(updated_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_passwords_created ON passwords(created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag_idx)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tags_entry ON tags(entry_id)")
+        # Row ids touched since the last backup, consumed by backup.Backup.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS change_journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                entry_id INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS backup_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
         conn.commit()
         return conn
 
     # ----------------- CRUD -----------------
     @staticmethod
-    def add_password(conn, fernet: Fernet, service: str, username: str, password: str):
-        """Encrypt and insert a new credential."""
+    def add_password(conn, fernet: Fernet, service: str, username: str, password: str, folder=None, tags=None):
+        """Encrypt and insert a new credential, optionally filed in a folder and tagged."""
         username_enc = fernet.encrypt(username.encode("utf-8"))
         password_enc = fernet.encrypt(password.encode("utf-8"))
         service_enc = fernet.encrypt(service.encode("utf-8"))
-        conn.execute(
-            "INSERT INTO passwords (service, username, password) VALUES (?, ?, ?)",
-            (service_enc, username_enc, password_enc)
+        folder_enc, folder_idx = Storage._encrypt_folder(fernet, folder)
+        now = int(time.time())
+        cursor = conn.execute(
+            "INSERT INTO passwords (service, username, password, folder, folder_idx, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (service_enc, username_enc, password_enc, folder_enc, folder_idx, now, now)
         )
+        if tags:
+            Storage._write_tags(conn, fernet, cursor.lastrowid, tags)
+        Storage.journal(conn, [cursor.lastrowid])
         conn.commit()
         log_info(f"Added password for service: {service}")
 
@@ -75,49 +126,77 @@ class Storage:
     def get_password(conn, fernet: Fernet, service: str):
         """Retrieve the decrypted username and password by scanning all entries."""
         cursor = conn.cursor()
-        cursor.execute("SELECT service, username, password FROM passwords")
+        cursor.execute("SELECT rowid, service, username, password, folder, created_at, updated_at FROM passwords")
         rows = cursor.fetchall()
-        for enc_service, enc_username, enc_password in rows:
+        for rowid, enc_service, enc_username, enc_password, enc_folder, created_at, updated_at in rows:
             try:
                 decrypted_service = fernet.decrypt(enc_service).decode("utf-8")
                 if decrypted_service.lower() == service.lower():
                     username = fernet.decrypt(enc_username).decode("utf-8")
                     password = fernet.decrypt(enc_password).decode("utf-8")
-                    return {"username": username, "password": password}
+                    return {
+                        "username": username,
+                        "password": password,
+                        "folder": Storage._decrypt_optional(fernet, enc_folder),
+                        "tags": Storage._read_tags(conn, fernet, [rowid]).get(rowid, []),
+                        "created_at": created_at,
+                        "updated_at": updated_at,
+                    }
             except InvalidToken:
                 continue
         log_error(f"Service not found or invalid key: {service}")
         return None
 
     @staticmethod
-    def update_password(conn, fernet: Fernet, service: str, username=None, password=None, new_service=None):
-        """Update credentials and optionally rename the service."""
+    def update_password(conn, fernet: Fernet, service: str, username=None, password=None, new_service=None,
+                        folder=None, tags=None):
+        """
+        Update credentials and optionally rename the service.
+        folder replaces the folder ("" clears it); tags replaces the tag list ([] clears it).
+        updated_at only moves when the password changes, so renames and
+        metadata edits do not hide an entry from the rotation check.
+        """
         cursor = conn.cursor()
-        cursor.execute("SELECT service FROM passwords")
+        cursor.execute("SELECT rowid, service FROM passwords")
         rows = cursor.fetchall()
-        for row in rows:
-            enc_service = row[0]
+        for rowid, enc_service in rows:
             try:
                 decrypted_service = fernet.decrypt(enc_service).decode("utf-8")
                 if decrypted_service.lower() == service.lower():
                     if username:
                         username_enc = fernet.encrypt(username.encode("utf-8"))
                         cursor.execute(
-                            "UPDATE passwords SET username=? WHERE service=?",
-                            (username_enc, enc_service)
+                            "UPDATE passwords SET username=? WHERE rowid=?",
+                            (username_enc, rowid)
                         )
                     if password:
                         password_enc = fernet.encrypt(password.encode("utf-8"))
                         cursor.execute(
-                            "UPDATE passwords SET password=? WHERE service=?",
-                            (password_enc, enc_service)
+                            "UPDATE passwords SET password=? WHERE rowid=?",
+                            (password_enc, rowid)
                         )
                     if new_service:
                         new_service_enc = fernet.encrypt(new_service.encode("utf-8"))
                         cursor.execute(
-                            "UPDATE passwords SET service=? WHERE service=?",
-                            (new_service_enc, enc_service)
+                            "UPDATE passwords SET service=? WHERE rowid=?",
+                            (new_service_enc, rowid)
                         )
+                    if folder is not None:
+                        folder_enc, folder_idx = Storage._encrypt_folder(fernet, folder)
+                        cursor.execute(
+                            "UPDATE passwords SET folder=?, folder_idx=? WHERE rowid=?",
+                            (folder_enc, folder_idx, rowid)
+                        )
+                    if tags is not None:
+                        cursor.execute("DELETE FROM tags WHERE entry_id=?", (rowid,))
+                        Storage._write_tags(conn, fernet, rowid, tags)
+                    if password:
+                        cursor.execute(
+                            "UPDATE passwords SET updated_at=? WHERE rowid=?",
+                            (int(time.time()), rowid)
+                        )
+                    if username or password or new_service or folder is not None or tags is not None:
+                        Storage.journal(conn, [rowid])
                     conn.commit()
                     log_info(f"Updated credentials for: {service}")
                     return True
@@ -133,14 +212,15 @@ class Storage:
         Returns True if deleted, False otherwise.
         """
         cursor = conn.cursor()
-        cursor.execute("SELECT service FROM passwords")
+        cursor.execute("SELECT rowid, service FROM passwords")
         rows = cursor.fetchall()
-        for row in rows:
-            enc_service = row[0]
+        for rowid, enc_service in rows:
             try:
                 decrypted_service = fernet.decrypt(enc_service).decode("utf-8")
                 if decrypted_service.lower() == service.lower():
-                    cursor.execute("DELETE FROM passwords WHERE service=?", (enc_service,))
+                    cursor.execute("DELETE FROM passwords WHERE rowid=?", (rowid,))
+                    conn.execute("DELETE FROM tags WHERE entry_id=?", (rowid,))
+                    Storage.journal(conn, [rowid])
                     conn.commit()
                     if cursor.rowcount > 0:
                         log_info(f"Deleted service: {service}")
@@ -152,4 +232,103 @@ class Storage:
                 log_error("Failed to decrypt a service name during deletion.")
                 continue
         log_error(f"Service not found for deletion: {service}")
-        return False
\ No newline at end of file
+        return False
+
+    @staticmethod
+    def journal(conn, entry_ids):
+        """Record row ids changed since the last backup. Runs inside the caller's transaction."""
+        conn.executemany("INSERT INTO change_journal (entry_id) VALUES (?)", [(entry_id,) for entry_id in entry_ids])
+
+    # ----------------- Filtering -----------------
+    @staticmethod
+    def find_entries(conn, fernet: Fernet, folder=None, tag=None, stale_days=None):
+        """
+        Return entries matching every given filter, oldest update first.
+        folder and tag are matched through their blind indexes and stale_days
+        through the updated_at index, so only matching rows are decrypted.
+        Entries from before timestamps were tracked count as stale.
+        """
+        clauses = []
+        params = []
+        if folder:
+            clauses.append("folder_idx=?")
+            params.append(fernet.blind_index(folder))
+        if tag:
+            clauses.append("rowid IN (SELECT entry_id FROM tags WHERE tag_idx=?)")
+            params.append(fernet.blind_index(tag))
+        if stale_days is not None:
+            clauses.append("updated_at < ?")
+            params.append(int(time.time()) - int(stale_days) * 86400)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        rows = conn.execute(
+            "SELECT rowid, service, username, folder, created_at, updated_at FROM passwords"
+            f"{where} ORDER BY updated_at",
+            params
+        ).fetchall()
+        tags_by_entry = Storage._read_tags(conn, fernet, [row[0] for row in rows])
+
+        entries = []
+        for rowid, enc_service, enc_username, enc_folder, created_at, updated_at in rows:
+            try:
+                entries.append({
+                    "service": fernet.decrypt(enc_service).decode("utf-8"),
+                    "username": fernet.decrypt(enc_username).decode("utf-8"),
+                    "folder": Storage._decrypt_optional(fernet, enc_folder),
+                    "tags": tags_by_entry.get(rowid, []),
+                    "created_at": created_at,
+                    "updated_at": updated_at,
+                })
+            except InvalidToken:
+                log_error("Failed to decrypt a filtered entry.")
+        return entries
+
+    # ----------------- Internal helpers -----------------
+    @staticmethod
+    def _encrypt_folder(fernet: Fernet, folder):
+        """Return (encrypted folder, blind index), or (None, None) for no folder."""
+        if not folder or not folder.strip():
+            return None, None
+        folder = folder.strip()
+        return fernet.encrypt(folder.encode("utf-8")), fernet.blind_index(folder)
+
+    @staticmethod
+    def _decrypt_optional(fernet: Fernet, token):
+        if token is None:
+            return None
+        try:
+            return fernet.decrypt(token).decode("utf-8")
+        except InvalidToken:
+            log_error("Failed to decrypt an optional field.")
+            return None
+
+    @staticmethod
+    def _write_tags(conn, fernet: Fernet, entry_id: int, tags):
+        """Insert encrypted tags (with blind indexes) for an entry, skipping blanks and duplicates."""
+        seen = set()
+        rows = []
+        for tag in tags:
+            tag = tag.strip()
+            if not tag or tag.lower() in seen:
+                continue
+            seen.add(tag.lower())
+            rows.append((entry_id, fernet.encrypt(tag.encode("utf-8")), fernet.blind_index(tag)))
+        conn.executemany("INSERT INTO tags (entry_id, tag, tag_idx) VALUES (?, ?, ?)", rows)
+
+    @staticmethod
+    def _read_tags(conn, fernet: Fernet, entry_ids):
+        """Return {entry_id: [tag, ...]} for the given entries only."""
+        tags_by_entry = {}
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(entry_ids), 500):
+            batch = entry_ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in batch)
+            rows = conn.execute(
+                f"SELECT entry_id, tag FROM tags WHERE entry_id IN ({placeholders}) ORDER BY rowid",
+                batch
+            ).fetchall()
+            for entry_id, enc_tag in rows:
+                tag = Storage._decrypt_optional(fernet, enc_tag)
+                if tag is not None:
+                    tags_by_entry.setdefault(entry_id, []).append(tag)
+        return tags_by_entry
\ No newline at end of file
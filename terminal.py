@@ -0,0 +1,107 @@
+import os
+import sys
+
+# Cursor home, clear screen, clear scrollback.
+CLEAR = "\x1b[H\x1b[2J\x1b[3J"
+CLEAR_LINE = "\x1b[K"
+
+_ansi_ready = None
+
+
+def _enable_ansi() -> bool:
+    """
+    Make sure the console understands ANSI escape sequences.
+    Only Windows needs work: virtual terminal processing is switched on once
+    through the console API instead of spawning a shell.
+    """
+    global _ansi_ready
+    if _ansi_ready is not None:
+        return _ansi_ready
+    _ansi_ready = True
+    if os.name == "nt":
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+            mode = ctypes.c_uint32()
+            if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+                _ansi_ready = False
+            elif not kernel32.SetConsoleMode(handle, mode.value | 0x0004):  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+                _ansi_ready = False
+        except (AttributeError, OSError):
+            _ansi_ready = False
+    return _ansi_ready
+
+
+def is_interactive() -> bool:
+    """True when stdout is a terminal that can handle screen control."""
+    try:
+        return sys.stdout.isatty() and _enable_ansi()
+    except (AttributeError, ValueError):
+        return False
+
+
+def write(text: str):
+    """Write text to stdout in a single call and flush it."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def redraw_screen(text: str = ""):
+    """
+    Clear the screen and draw text in one buffered write.
+    When stdout is not a terminal the clear is skipped and text is written as is.
+    """
+    if is_interactive():
+        write(CLEAR + text)
+    elif text:
+        write(text)
+
+
+def clear_screen():
+    """Clears the terminal screen without spawning a subprocess."""
+    redraw_screen()
+
+
+class FrameRenderer:
+    """
+    Draws animation frames at the top of the screen, rewriting only the lines
+    that changed since the previous frame.
+
+    When stdout is not a terminal, intermediate frames are dropped and only
+    the last one is written on close().
+    """
+
+    def __init__(self):
+        self._interactive = is_interactive()
+        self._lines = None
+        self._pending = None
+
+    def draw(self, frame: str):
+        lines = frame.split("\n")
+        if not self._interactive:
+            self._pending = frame
+            return
+
+        if self._lines is None:
+            write(CLEAR + frame)
+            self._lines = lines
+            return
+
+        out = []
+        for row in range(max(len(lines), len(self._lines))):
+            new = lines[row] if row < len(lines) else ""
+            old = self._lines[row] if row < len(self._lines) else ""
+            if new != old:
+                out.append(f"\x1b[{row + 1};1H{new}{CLEAR_LINE}")
+        if out:
+            # Park the cursor below the new frame.
+            out.append(f"\x1b[{len(lines) + 1};1H")
+            write("".join(out))
+        self._lines = lines
+
+    def close(self):
+        if not self._interactive and self._pending:
+            write(self._pending + "\n")
+        self._pending = None
+        self._lines = None
\ No newline at end of file
@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import debug  # noqa: E402
+from security import VaultFernet, derive_key  # noqa: E402
+
+# Keep debug.log out of the working tree while tests run.
+debug.get_logger(os.path.join(tempfile.gettempdir(), "nexa-tests-debug.log"))
+
+# Far fewer PBKDF2 rounds than the real default; the tests exercise storage, not the KDF.
+TEST_KEY = derive_key("correct horse", iterations=1000)
+
+
+class VaultTestCase(unittest.TestCase):
+    """Runs each test against an empty Nexa data directory in a temporary HOME."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.home = tmp.name
+        env = mock.patch.dict(os.environ, {"HOME": self.home, "LOCALAPPDATA": self.home})
+        env.start()
+        self.addCleanup(env.stop)
+        self.key = TEST_KEY
+        self.fernet = VaultFernet(TEST_KEY)
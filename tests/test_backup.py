@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import time
+import unittest
+from unittest import mock
+
+from support import VaultTestCase
+from backup import Backup
+from security import VaultFernet, derive_key
+from storage import Storage
+
+
+class BackupTestCase(VaultTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn = Storage.init_db()
+        self.addCleanup(self.conn.close)
+
+    def backup(self, at, full=False):
+        """Create a backup whose file name carries the Unix time `at`."""
+        with mock.patch("backup.time.time", return_value=at):
+            return Backup.create(self.conn, self.fernet, full=full)
+
+    def restore(self, at=None, name="restored.db"):
+        path = os.path.join(self.home, name)
+        applied = Backup.restore(self.fernet, path, at)
+        conn = sqlite3.connect(path)
+        self.addCleanup(conn.close)
+        return conn, applied
+
+    def vault(self, conn):
+        """Return {service: (password, tags)} for every entry in conn."""
+        entries = {}
+        for (enc_service,) in conn.execute("SELECT service FROM passwords"):
+            service = self.fernet.decrypt(enc_service).decode("utf-8")
+            entry = Storage.get_password(conn, self.fernet, service)
+            entries[service] = (entry["password"], entry["tags"])
+        return entries
+
+
+class CreateRestoreTest(BackupTestCase):
+    def test_point_in_time_restore(self):
+        Storage.add_password(self.conn, self.fernet, "aws", "u", "v1", tags=["ops"])
+        Storage.add_password(self.conn, self.fernet, "db", "u", "v1")
+        self.assertIn("-full-", self.backup(1000))
+
+        Storage.update_password(self.conn, self.fernet, "aws", password="v2", tags=["rotated"])
+        Storage.add_password(self.conn, self.fernet, "mail", "u", "v1")
+        self.assertIn("-delta-", self.backup(2000))
+
+        Storage.delete_password(self.conn, self.fernet, "db")
+        self.assertIn("-delta-", self.backup(3000))
+
+        expected = {
+            1000: {"aws": ("v1", ["ops"]), "db": ("v1", [])},
+            2000: {"aws": ("v2", ["rotated"]), "db": ("v1", []), "mail": ("v1", [])},
+            3000: {"aws": ("v2", ["rotated"]), "mail": ("v1", [])},
+        }
+        for at, state in expected.items():
+            conn, applied = self.restore(at, f"restored-{at}.db")
+            self.assertEqual(len(applied), [1000, 2000, 3000].index(at) + 1)
+            self.assertEqual(self.vault(conn), state)
+            # A restored vault starts a new chain.
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM change_journal").fetchone()[0], 0)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM backup_meta").fetchone()[0], 0)
+
+        self.assertEqual(self.vault(self.restore(name="latest.db")[0]), expected[3000])
+
+    def test_empty_delta_is_skipped(self):
+        Storage.add_password(self.conn, self.fernet, "aws", "u", "p")
+        self.backup(1000)
+        self.assertIsNone(self.backup(2000))
+        self.assertEqual(len(Backup.list_backups()), 1)
+
+    def test_reused_rowid_after_delete(self):
+        Storage.add_password(self.conn, self.fernet, "aws", "u", "p")
+        Storage.add_password(self.conn, self.fernet, "old", "u", "old-pw", tags=["legacy"])
+        self.backup(1000)
+
+        Storage.delete_password(self.conn, self.fernet, "old")
+        Storage.add_password(self.conn, self.fernet, "new", "u", "new-pw")
+        self.assertEqual(self.conn.execute("SELECT rowid FROM passwords ORDER BY rowid").fetchall(), [(1,), (2,)])
+        self.backup(2000)
+
+        conn, _ = self.restore()
+        self.assertEqual(self.vault(conn), {"aws": ("p", []), "new": ("new-pw", [])})
+
+    def test_broken_chain_falls_back_to_full(self):
+        Storage.add_password(self.conn, self.fernet, "aws", "u", "p")
+        self.backup(1000)
+        Storage.add_password(self.conn, self.fernet, "db", "u", "p")
+        self.conn.execute("UPDATE backup_meta SET value='000009-delta-1.nexa' WHERE key='last_backup'")
+        self.conn.commit()
+
+        self.assertIn("-full-", self.backup(2000))
+        conn, applied = self.restore()
+        self.assertEqual(len(applied), 1)
+        self.assertEqual(set(self.vault(conn)), {"aws", "db"})
+
+    def test_journal_write_during_backup_is_kept(self):
+        Storage.add_password(self.conn, self.fernet, "aws", "u", "p")
+        self.backup(1000)
+        Storage.add_password(self.conn, self.fernet, "db", "u", "p")
+
+        write_encrypted = Backup._write_encrypted
+
+        def write_then_change(path, fernet, payload):
+            # Lands after the delta was read but before the journal is cleared.
+            Storage.add_password(self.conn, self.fernet, "late", "u", "p")
+            write_encrypted(path, fernet, payload)
+
+        with mock.patch.object(Backup, "_write_encrypted", side_effect=write_then_change):
+            self.backup(2000)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM change_journal").fetchone()[0], 1)
+
+        self.assertEqual(set(self.vault(self.restore(name="before.db")[0])), {"aws", "db"})
+        self.backup(3000)
+        self.assertEqual(set(self.vault(self.restore(name="after.db")[0])), {"aws", "db", "late"})
+
+
+class RestoreErrorTest(BackupTestCase):
+    def setUp(self):
+        super().setUp()
+        Storage.add_password(self.conn, self.fernet, "aws", "u", "p")
+        self.backup(1000)
+        Storage.add_password(self.conn, self.fernet, "db", "u", "p")
+        self.delta = self.backup(2000)
+        self.output = os.path.join(self.home, "restored.db")
+
+    def test_wrong_key(self):
+        other = VaultFernet(derive_key("someone else", iterations=1000))
+        with self.assertRaises(ValueError):
+            Backup.restore(other, self.output)
+        self.assertEqual(os.listdir(self.home).count("restored.db.tmp"), 0)
+
+    def test_corrupt_delta_leaves_no_files(self):
+        with open(os.path.join(Backup.get_backup_dir(), self.delta), "r+b") as f:
+            f.write(b"garbage")
+        with self.assertRaises(ValueError):
+            Backup.restore(self.fernet, self.output)
+        self.assertFalse(os.path.exists(self.output))
+        self.assertFalse(os.path.exists(self.output + ".tmp"))
+
+    def test_refuses_to_overwrite(self):
+        open(self.output, "w").close()
+        with self.assertRaises(FileExistsError):
+            Backup.restore(self.fernet, self.output)
+
+
+class SchedulerTest(BackupTestCase):
+    def test_first_backup_runs_immediately_and_thread_stops(self):
+        stop, thread = Backup.start_scheduler(self.fernet, interval=3600)
+        deadline = time.time() + 5
+        while not Backup.list_backups() and time.time() < deadline:
+            time.sleep(0.01)
+        stop.set()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(Backup.list_backups()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
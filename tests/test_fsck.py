@@ -0,0 +1,127 @@
+import io
+import os
+import sqlite3
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from support import VaultTestCase
+import fsck
+from fsck import Fsck
+from storage import Storage
+
+
+class FsckTestCase(VaultTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn = Storage.init_db()
+        self.addCleanup(self.conn.close)
+
+    def run_fsck(self, conn=None, **kwargs):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = Fsck.run(conn or self.conn, self.key, workers=1, **kwargs)
+        return code, out.getvalue()
+
+
+class VerifyRowsTest(FsckTestCase):
+    def test_clean_vault(self):
+        Storage.add_password(self.conn, self.fernet, "aws", "root", "pw", "prod", ["ops"])
+        code, output = self.run_fsck()
+        self.assertEqual(code, 0)
+        self.assertNotIn("\r", output)  # no progress redraws when stdout is not a terminal
+
+    def test_bad_tag_marks_row_unreadable(self):
+        Storage.add_password(self.conn, self.fernet, "aws", "root", "pw", "prod", ["ops"])
+        Storage.add_password(self.conn, self.fernet, "db", "admin", "pw")
+        self.conn.execute("UPDATE tags SET tag=x'00'")
+        self.conn.commit()
+        with redirect_stdout(io.StringIO()):
+            unreadable, duplicates, damaged = Fsck.verify_rows(self.conn, self.key, workers=1)
+        self.assertEqual((unreadable, duplicates, damaged), ([1], {}, []))
+
+    def test_duplicates_and_bad_tokens_across_parallel_chunks(self):
+        for i in range(30):
+            Storage.add_password(self.conn, self.fernet, f"svc{i}", "u", "p")
+        Storage.add_password(self.conn, self.fernet, "SVC3", "u", "p")
+        self.conn.execute("UPDATE passwords SET password=x'00' WHERE rowid=17")
+        self.conn.commit()
+        with mock.patch.object(fsck, "CHUNK_SIZE", 8), redirect_stdout(io.StringIO()):
+            unreadable, duplicates, damaged = Fsck.verify_rows(self.conn, self.key, workers=2)
+        self.assertEqual(unreadable, [17])
+        self.assertEqual(duplicates, {"svc3": [4, 31]})
+        self.assertEqual(damaged, [])
+
+    def test_checks_the_file_behind_conn(self):
+        Storage.add_password(self.conn, self.fernet, "live", "u", "p")
+        other_path = os.path.join(self.home, "other.db")
+        other = sqlite3.connect(other_path)
+        self.addCleanup(other.close)
+        other.execute("CREATE TABLE passwords (service BLOB NOT NULL, username BLOB NOT NULL, password BLOB NOT NULL)")
+        other.execute("INSERT INTO passwords VALUES (x'00', x'00', x'00')")
+        other.commit()
+        code, output = self.run_fsck(Storage.connect_readonly(other_path))
+        self.assertEqual(code, 1)
+        self.assertIn("Unreadable rows: 1", output)
+
+    def test_corrupt_file_is_reported_not_raised(self):
+        token = self.fernet.encrypt(b"x")
+        self.conn.executemany(
+            "INSERT INTO passwords (service, username, password) VALUES (?, ?, ?)",
+            [(token, token, token)] * 6000
+        )
+        self.conn.commit()
+        self.conn.close()
+        path = Storage.get_db_path()
+        with open(path, "r+b") as f:
+            f.seek(os.path.getsize(path) // 2 // 4096 * 4096)
+            f.write(b"\xff\xff\xff\xff")
+
+        conn = Storage.connect_readonly()
+        self.addCleanup(conn.close)
+        code, output = self.run_fsck(conn)
+        self.assertEqual(code, 1)
+        self.assertIn("malformed", output)
+
+
+class QuarantineTest(FsckTestCase):
+    def test_legacy_quarantine_table_is_migrated(self):
+        self.conn.execute(
+            "CREATE TABLE quarantine (original_rowid INTEGER NOT NULL, reason TEXT NOT NULL, "
+            "service BLOB, username BLOB, password BLOB)"
+        )
+        Storage.add_password(self.conn, self.fernet, "aws", "u", "p")
+        Storage.add_password(self.conn, self.fernet, "AWS", "u", "p")
+        code, _ = self.run_fsck(quarantine=True)
+        self.assertEqual(code, 1)
+        self.assertEqual(self.conn.execute("SELECT original_rowid, reason FROM quarantine").fetchall(), [(2, "duplicate")])
+
+    def test_quarantine_keeps_tags_and_release_restores_entry(self):
+        Storage.add_password(self.conn, self.fernet, "aws", "u", "p1", "prod", ["keep"])
+        Storage.add_password(self.conn, self.fernet, "aws", "u", "p2", "dev", ["ops", "cloud"])
+        self.run_fsck(quarantine=True)
+
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM passwords").fetchone()[0], 1)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM quarantine_tags").fetchone()[0], 2)
+        self.assertEqual(self.run_fsck()[0], 0)
+
+        self.assertEqual(Fsck.release(self.conn, [2]), {2: 2})
+        entries = Storage.find_entries(self.conn, self.fernet, folder="dev", tag="ops")
+        self.assertEqual([(e["service"], e["tags"]) for e in entries], [("aws", ["ops", "cloud"])])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM quarantine").fetchone()[0], 0)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM quarantine_tags").fetchone()[0], 0)
+
+    def test_release_uses_new_rowid_when_original_is_taken(self):
+        Storage.add_password(self.conn, self.fernet, "a", "u", "p")
+        Storage.add_password(self.conn, self.fernet, "b", "u", "p", tags=["t"])
+        with redirect_stdout(io.StringIO()):
+            Fsck.quarantine(self.conn, [2], "test")
+        Storage.add_password(self.conn, self.fernet, "c", "u", "p")  # reuses rowid 2
+        released = Fsck.release(self.conn, [2])
+        self.assertNotEqual(released[2], 2)
+        self.assertEqual(Storage.get_password(self.conn, self.fernet, "b")["tags"], ["t"])
+        self.assertIsNotNone(Storage.get_password(self.conn, self.fernet, "c"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import json
+import base64
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed for `import main`, in milliseconds.
+# Override with NEXA_IMPORT_BUDGET_MS on unusually slow machines.
+IMPORT_BUDGET_MS = float(os.getenv("NEXA_IMPORT_BUDGET_MS", "60"))
+
+# Modules that must not load before the first prompt.
+DEFERRED_MODULES = ("pyfiglet", "cryptography", "sqlite3", "logging", "argparse", "multiprocessing")
+
+
+def import_times(module="main"):
+    """Return {module name: cumulative microseconds} from `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative.strip())
+        except ValueError:
+            continue  # header line
+    return times
+
+
+# Runs main() until the login prompt, then prints the loaded modules and stops.
+PROMPT_PROBE = """
+import getpass, json, sys
+sys.path.insert(0, {root!r})
+
+class AtPrompt(Exception):
+    pass
+
+def at_prompt(*args, **kwargs):
+    raise AtPrompt
+
+getpass.getpass = at_prompt
+import main
+try:
+    main.main()
+except AtPrompt:
+    sys.stderr.write("MODULES=" + json.dumps(sorted(sys.modules)) + "\\n")
+"""
+
+
+def modules_at_prompt():
+    """Return the modules loaded when main() reaches the master password prompt."""
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, LOCALAPPDATA=home)
+        data_dir = os.path.join(home, "Library", "Application Support") if sys.platform == "darwin" \
+            else home if os.name == "nt" else os.path.join(home, ".local", "share")
+        os.makedirs(os.path.join(data_dir, "Nexa"))
+        with open(os.path.join(data_dir, "Nexa", "master.hash"), "w") as f:
+            json.dump({"salt": base64.b64encode(b"0" * 16).decode(), "hash": "unused"}, f)
+        result = subprocess.run(
+            [sys.executable, "-c", PROMPT_PROBE.format(root=REPO_ROOT)],
+            cwd=home,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        debug_log_written = os.path.exists(os.path.join(home, "debug.log"))
+    for line in result.stderr.splitlines():
+        if line.startswith("MODULES="):
+            return set(json.loads(line[len("MODULES="):])), debug_log_written
+    raise AssertionError(f"main() never reached the login prompt:\n{result.stderr}")
+
+
+class StartupImportTest(unittest.TestCase):
+    def test_heavy_modules_are_deferred(self):
+        loaded = import_times().keys()
+        for module in DEFERRED_MODULES:
+            offenders = [name for name in loaded if name == module or name.startswith(module + ".")]
+            self.assertEqual(offenders, [], f"{module} is imported on the start-up path")
+
+    def test_heavy_modules_are_deferred_until_prompt(self):
+        loaded, debug_log_written = modules_at_prompt()
+        for module in DEFERRED_MODULES:
+            offenders = [name for name in loaded if name == module or name.startswith(module + ".")]
+            self.assertEqual(offenders, [], f"{module} is loaded before the login prompt")
+        self.assertFalse(debug_log_written, "debug.log is opened before the login prompt")
+
+    def test_import_time_within_budget(self):
+        # Best of three runs to keep scheduler noise out of the measurement.
+        best_ms = min(import_times()["main"] for _ in range(3)) / 1000
+        self.assertLessEqual(
+            best_ms, IMPORT_BUDGET_MS,
+            f"import main took {best_ms:.1f} ms, budget is {IMPORT_BUDGET_MS:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import time
+import sqlite3
+import unittest
+
+from support import VaultTestCase, TEST_KEY
+from security import VaultFernet
+from storage import Storage
+
+
+class CountingFernet(VaultFernet):
+    """VaultFernet that counts decryptions."""
+
+    def __init__(self, key):
+        super().__init__(key)
+        self.decrypts = 0
+
+    def decrypt(self, token, ttl=None):
+        self.decrypts += 1
+        return super().decrypt(token, ttl)
+
+
+class FindEntriesTest(VaultTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn = Storage.init_db()
+        self.addCleanup(self.conn.close)
+        self.fernet = CountingFernet(TEST_KEY)
+        Storage.add_password(self.conn, self.fernet, "aws", "root", "pw1", "Prod", ["Ops", "cloud"])
+        Storage.add_password(self.conn, self.fernet, "db", "admin", "pw2", "prod", ["data"])
+        Storage.add_password(self.conn, self.fernet, "github", "me", "pw3", "dev", ["ops"])
+        Storage.add_password(self.conn, self.fernet, "mail", "me", "pw4")
+        old = int(time.time()) - 100 * 86400
+        self.conn.execute("UPDATE passwords SET updated_at=? WHERE rowid IN (1, 3)", (old,))
+        self.conn.commit()
+
+    def services(self, **filters):
+        return sorted(entry["service"] for entry in Storage.find_entries(self.conn, self.fernet, **filters))
+
+    def test_folder_filter_ignores_case(self):
+        self.assertEqual(self.services(folder="PROD"), ["aws", "db"])
+        self.assertEqual(self.services(folder=" prod "), ["aws", "db"])
+
+    def test_tag_filter_ignores_case(self):
+        self.assertEqual(self.services(tag="OPS"), ["aws", "github"])
+
+    def test_stale_filter(self):
+        self.assertEqual(self.services(stale_days=90), ["aws", "github"])
+
+    def test_filters_combine(self):
+        self.assertEqual(self.services(folder="prod", tag="ops", stale_days=90), ["aws"])
+        self.assertEqual(self.services(folder="dev", tag="data"), [])
+
+    def test_only_matching_rows_are_decrypted(self):
+        self.fernet.decrypts = 0
+        entries = Storage.find_entries(self.conn, self.fernet, folder="prod", tag="ops")
+        self.assertEqual(len(entries), 1)
+        # service, username, folder and two tags of the single match.
+        self.assertEqual(self.fernet.decrypts, 5)
+
+    def test_entry_fields(self):
+        entry, = Storage.find_entries(self.conn, self.fernet, tag="data")
+        self.assertEqual(entry["username"], "admin")
+        self.assertEqual(entry["folder"], "prod")
+        self.assertEqual(entry["tags"], ["data"])
+
+    def test_stale_filter_uses_index_range(self):
+        plan = " ".join(row[-1] for row in self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT rowid, service, username FROM passwords "
+            "WHERE updated_at < ? ORDER BY updated_at", (0,)
+        ))
+        self.assertIn("SEARCH passwords", plan)
+        self.assertIn("idx_passwords_updated (updated_at<?)", plan)
+        self.assertNotIn("SCAN", plan)
+
+
+class UpdatePasswordTest(VaultTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn = Storage.init_db()
+        self.addCleanup(self.conn.close)
+        Storage.add_password(self.conn, self.fernet, "aws", "root", "pw", "prod", ["ops"])
+        self.conn.execute("UPDATE passwords SET updated_at=5")
+        self.conn.execute("DELETE FROM change_journal")
+        self.conn.commit()
+
+    def state(self):
+        updated_at = self.conn.execute("SELECT updated_at FROM passwords").fetchone()[0]
+        journaled = self.conn.execute("SELECT COUNT(*) FROM change_journal").fetchone()[0]
+        return updated_at, journaled
+
+    def test_no_change_touches_nothing(self):
+        Storage.update_password(self.conn, self.fernet, "aws")
+        self.assertEqual(self.state(), (5, 0))
+
+    def test_metadata_change_keeps_password_age(self):
+        Storage.update_password(self.conn, self.fernet, "AWS", new_service="amazon", tags=["x"], folder="")
+        self.assertEqual(self.state(), (5, 1))
+        entry = Storage.get_password(self.conn, self.fernet, "amazon")
+        self.assertEqual((entry["folder"], entry["tags"]), (None, ["x"]))
+
+    def test_password_change_bumps_updated_at(self):
+        Storage.update_password(self.conn, self.fernet, "aws", password="new")
+        updated_at, journaled = self.state()
+        self.assertGreater(updated_at, 5)
+        self.assertEqual(journaled, 1)
+
+
+class MigrationTest(VaultTestCase):
+    def test_legacy_vault_gains_columns_and_zero_timestamps(self):
+        conn = sqlite3.connect(Storage.get_db_path())
+        conn.execute("CREATE TABLE passwords (service BLOB NOT NULL, username BLOB NOT NULL, password BLOB NOT NULL)")
+        conn.execute(
+            "INSERT INTO passwords VALUES (?, ?, ?)",
+            (self.fernet.encrypt(b"old"), self.fernet.encrypt(b"u"), self.fernet.encrypt(b"p"))
+        )
+        conn.commit()
+        conn.close()
+
+        conn = Storage.init_db()
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("SELECT created_at, updated_at FROM passwords").fetchone(), (0, 0))
+        self.assertEqual([e["service"] for e in Storage.find_entries(conn, self.fernet, stale_days=90)], ["old"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import os
+import subprocess
+import unittest
+from unittest import mock
+
+from support import VaultTestCase
+import terminal
+from terminal import FrameRenderer, redraw_screen
+from storage import Storage
+from UI import UI
+
+
+class FakeTTY(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class MenuSpawnTest(VaultTestCase):
+    def test_menu_navigation_spawns_no_processes(self):
+        conn = Storage.init_db()
+        self.addCleanup(conn.close)
+        answers = [
+            "1", "aws", "root", "pw", "prod", "ops", "",  # add
+            "2", "1", "",                                 # retrieve
+            "6", "prod", "", "", "",                      # filter
+            "9", "",                                      # invalid choice
+            "7",                                          # exit
+        ]
+        out = FakeTTY()
+        spawners = {
+            "system": mock.patch.object(os, "system"),
+            "fork": mock.patch.object(os, "fork", create=True),
+            "posix_spawn": mock.patch.object(os, "posix_spawn", create=True),
+            "startfile": mock.patch.object(os, "startfile", create=True),
+            "Popen": mock.patch.object(subprocess, "Popen"),
+        }
+        mocks = {name: patcher.start() for name, patcher in spawners.items()}
+        for patcher in spawners.values():
+            self.addCleanup(patcher.stop)
+
+        with mock.patch("builtins.input", side_effect=answers), \
+                mock.patch("time.sleep"), \
+                mock.patch("sys.stdout", out):
+            UI.main_menu(conn, self.fernet)
+
+        for name, spawner in mocks.items():
+            self.assertFalse(spawner.called, f"menu navigation called {name}")
+        self.assertIn(terminal.CLEAR, out.getvalue())
+
+
+class NonTTYTest(unittest.TestCase):
+    def test_redraw_writes_no_escape_codes(self):
+        out = io.StringIO()
+        with mock.patch("sys.stdout", out):
+            redraw_screen("menu\n")
+        self.assertEqual(out.getvalue(), "menu\n")
+
+    def test_frame_renderer_writes_only_final_frame(self):
+        out = io.StringIO()
+        with mock.patch("sys.stdout", out):
+            renderer = FrameRenderer()
+            for frame in ("one\n|", "one\n/", "two\n-"):
+                renderer.draw(frame)
+            self.assertEqual(out.getvalue(), "")
+            renderer.close()
+        self.assertEqual(out.getvalue(), "two\n-\n")
+
+    def test_frame_renderer_redraws_changed_lines_on_tty(self):
+        out = FakeTTY()
+        with mock.patch("sys.stdout", out):
+            renderer = FrameRenderer()
+            renderer.draw("banner\nspin |")
+            first = len(out.getvalue())
+            renderer.draw("banner\nspin /")
+        update = out.getvalue()[first:]
+        self.assertNotIn("banner", update)
+        self.assertIn("\x1b[2;1Hspin /", update)
+
+
+if __name__ == "__main__":
+    unittest.main()